@@ -1,64 +1,254 @@
 import flet as ft
+import asyncio
+import concurrent.futures
 import sqlite3
+import threading
 from datetime import datetime
 import os
+import time
 
 # --- Database Manager ---
+# WAL + synchronous=NORMAL turns each commit into a single append to the
+# write-ahead log instead of two fsyncs on the rollback journal.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA foreign_keys=ON",
+    # Bound the rows ANALYZE/optimize sample per index
+    "PRAGMA analysis_limit=1000",
+)
+
+# SQL is kept in module-level constants so every call passes identical text;
+# sqlite3's per-connection statement cache is keyed on that text, so repeat
+# calls reuse the compiled statement instead of preparing it again.
+SQL_ADD_EXERCISE = "INSERT INTO exercises (name, routine) VALUES (?, ?)"
+# Each exercise comes with its most recent set so cards can show it without
+# a query per card; the subquery is a single probe of idx_logs_exid_ts_id.
+SQL_GET_EXERCISES = """
+    SELECT e.id, e.name, l.weight, l.reps, l.sets
+    FROM exercises e
+    LEFT JOIN logs l ON l.id = (
+        SELECT id FROM logs WHERE exercise_id = e.id ORDER BY timestamp DESC, id DESC LIMIT 1
+    )
+    WHERE e.routine = ?
+    ORDER BY e.id
+"""
+SQL_DELETE_EXERCISE = "DELETE FROM exercises WHERE id = ?"
+SQL_DELETE_LOGS = "DELETE FROM logs WHERE exercise_id = ?"
+SQL_LOG_SET = "INSERT INTO logs (exercise_id, weight, reps, sets, timestamp) VALUES (?, ?, ?, ?, ?)"
+SQL_GET_HISTORY = "SELECT weight, reps, sets, timestamp, id FROM logs WHERE exercise_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?"
+# Keyset pagination: continue after the (timestamp, id) of the last row shown
+SQL_GET_HISTORY_BEFORE = "SELECT weight, reps, sets, timestamp, id FROM logs WHERE exercise_id = ? AND (timestamp, id) < (?, ?) ORDER BY timestamp DESC, id DESC LIMIT ?"
+
+HISTORY_PAGE_SIZE = 20
+
+# Logged sets are buffered this long (seconds) so back-to-back taps are
+# written with one executemany/commit instead of one transaction each.
+LOG_FLUSH_DELAY = 0.1
+# After a failed write (e.g. database locked) the batch stays queued and is
+# retried this long (seconds) later.
+LOG_RETRY_DELAY = 2.0
+
+def settle(future, result=None, error=None):
+    # The task awaiting the set may have been cancelled
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
 class DatabaseManager:
     def __init__(self, db_name="gym_data.db"):
         self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        # Rows are read by column name so callers don't depend on SELECT order
+        self.conn.row_factory = sqlite3.Row
+        # The UI runs queries on worker threads; serialize use of the connection
+        self.lock = threading.RLock()
+        self._pending = []
+        self._flush_timer = None
+        for pragma in CONNECTION_PRAGMAS:
+            self.conn.execute(pragma)
         self.create_tables()
 
     def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
+        with self.conn:
+            self.create_schema()
+
+        # Databases created before the cascade was declared still need their
+        # logs removed by hand.
+        self.cascade_deletes = any(
+            fk["on_delete"] == "CASCADE" for fk in self.conn.execute("PRAGMA foreign_key_list(logs)")
+        )
+
+        # Planner statistics for the indexes above. ANALYZE runs until it has
+        # recorded some (a brand-new database only yields an empty table);
+        # 0x10002 lets optimize check every table, not just ones this
+        # connection has queried, on SQLite 3.46+.
+        if not self.has_planner_stats():
+            self.conn.execute("ANALYZE")
+        self.conn.execute("PRAGMA optimize=0x10002")
+
+    def has_planner_stats(self):
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            return False
+        return self.conn.execute("SELECT 1 FROM sqlite_stat1 LIMIT 1").fetchone() is not None
+
+    def optimize(self):
+        # Refreshes statistics for the tables this session queried; meant for
+        # when the app is backgrounded or closed
+        try:
+            with self.lock:
+                self.conn.execute("PRAGMA optimize")
+        except sqlite3.Error as ex:
+            print(f"Error optimizing database: {ex}")
+
+    def create_schema(self):
+        execute = self.conn.execute
+        execute('''
             CREATE TABLE IF NOT EXISTS exercises (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
-                routine TEXT NOT NULL
+                routine TEXT NOT NULL COLLATE NOCASE
             )
         ''')
-        cursor.execute('''
+        execute('''
             CREATE TABLE IF NOT EXISTS logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 exercise_id INTEGER,
                 weight REAL,
                 reps INTEGER,
                 sets INTEGER,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (exercise_id) REFERENCES exercises (id)
+                timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                FOREIGN KEY (exercise_id) REFERENCES exercises (id) ON DELETE CASCADE
             )
         ''')
-        self.conn.commit()
+        # Match the filters/ordering used by get_exercises and get_history;
+        # (routine, id, name) covers get_exercises so it never reads the table
+        execute("CREATE INDEX IF NOT EXISTS idx_exercises_routine_cover ON exercises (routine, id, name)")
+        execute("CREATE INDEX IF NOT EXISTS idx_logs_exid_ts_id ON logs (exercise_id, timestamp DESC, id DESC)")
+
+        # v1: timestamps are unix seconds; convert rows written as TEXT
+        if execute("PRAGMA user_version").fetchone()[0] < 1:
+            execute("UPDATE logs SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER) WHERE typeof(timestamp) = 'text'")
+            execute("PRAGMA user_version = 1")
 
     def add_exercise(self, name, routine):
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO exercises (name, routine) VALUES (?, ?)", (name, routine))
-        self.conn.commit()
-        return cursor.lastrowid
+        with self.lock:
+            with self.conn:
+                return self.conn.execute(SQL_ADD_EXERCISE, (name, routine)).lastrowid
 
     def get_exercises(self, routine):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM exercises WHERE routine = ?", (routine,))
-        return cursor.fetchall()
+        with self.lock:
+            self.flush_queued() # latest set must include buffered logs
+            return self.conn.execute(SQL_GET_EXERCISES, (routine,)).fetchall()
 
     def remove_exercise(self, exercise_id):
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM exercises WHERE id = ?", (exercise_id,))
-        cursor.execute("DELETE FROM logs WHERE exercise_id = ?", (exercise_id,))
-        self.conn.commit()
+        with self.lock:
+            self.flush_queued()
+            with self.conn:
+                if not self.cascade_deletes:
+                    # Children first: foreign keys are enforced on this connection
+                    self.conn.execute(SQL_DELETE_LOGS, (exercise_id,))
+                self.conn.execute(SQL_DELETE_EXERCISE, (exercise_id,))
 
     def log_set(self, exercise_id, weight, reps, sets=1):
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO logs (exercise_id, weight, reps, sets) VALUES (?, ?, ?, ?)", (exercise_id, weight, reps, sets))
-        self.conn.commit()
+        # Queues the set and returns a Future that resolves to its timestamp
+        # once the batch holding it is committed, or fails if it isn't.
+        saved = concurrent.futures.Future()
+        with self.lock:
+            # Stamped here rather than by the column default, which is still
+            # TEXT on databases created before the INTEGER migration.
+            self._pending.append(((exercise_id, weight, reps, sets, int(time.time())), saved))
+            if self._flush_timer is None:
+                self.schedule_flush(LOG_FLUSH_DELAY)
+        return saved
+
+    def schedule_flush(self, delay):
+        self._flush_timer = threading.Timer(delay, self.flush_queued)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def flush_queued(self):
+        # For the timer, lifecycle hooks and reads: a failed write leaves its
+        # sets queued for a retry, so log the error and carry on.
+        try:
+            self.flush()
+        except sqlite3.Error as ex:
+            print(f"Error writing logged sets: {ex}")
+
+    def flush(self):
+        with self.lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            try:
+                with self.conn:
+                    self.conn.executemany(SQL_LOG_SET, [row for row, _ in pending])
+            except sqlite3.IntegrityError:
+                # A set that breaks a constraint fails on every retry; write
+                # the batch one row at a time so only that set is rejected.
+                self.write_each(pending)
+                return
+            except Exception:
+                # Keep the batch queued and retry it; the waiting taps stay
+                # pending until it commits.
+                self.requeue(pending)
+                raise
+            for row, saved in pending:
+                settle(saved, row[4])
+
+    def write_each(self, pending):
+        for i, (row, saved) in enumerate(pending):
+            try:
+                with self.conn:
+                    self.conn.execute(SQL_LOG_SET, row)
+            except sqlite3.IntegrityError as ex:
+                settle(saved, error=ex)
+            except Exception:
+                self.requeue(pending[i:])
+                raise
+            else:
+                settle(saved, row[4])
 
-    def get_history(self, exercise_id):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT weight, reps, sets, timestamp FROM logs WHERE exercise_id = ? ORDER BY timestamp DESC LIMIT 20", (exercise_id,))
-        return cursor.fetchall()
+    def requeue(self, pending):
+        self._pending[:0] = pending
+        if self._flush_timer is None:
+            self.schedule_flush(LOG_RETRY_DELAY)
+
+    def get_history(self, exercise_id, before_ts=None, before_id=None, limit=HISTORY_PAGE_SIZE):
+        with self.lock:
+            self.flush_queued() # read-your-writes for sets still buffered
+            if before_ts is None:
+                return self.conn.execute(SQL_GET_HISTORY, (exercise_id, limit)).fetchall()
+            return self.conn.execute(SQL_GET_HISTORY_BEFORE, (exercise_id, before_ts, before_id, limit)).fetchall()
 
 # --- Exercise Card Component ---
+HISTORY_DATE_FMT = '%b %d'
+
+# Styling shared by every card. These are value objects, not controls, so
+# one instance can be referenced from any number of cards.
+CARD_ANIMATION = ft.Animation(300, ft.AnimationCurve.EASE_OUT)
+NUMBER_FIELD_KWARGS = dict(
+    keyboard_type=ft.KeyboardType.NUMBER,
+    border_radius=10,
+    text_size=14,
+    dense=True,
+    content_padding=10
+)
+SAVE_BUTTON_STYLE = ft.ButtonStyle(
+    color=ft.Colors.WHITE,
+    bgcolor=ft.Colors.BLUE_600,
+    shape=ft.RoundedRectangleBorder(radius=10),
+    padding=10
+)
+HISTORY_ROW_BORDER = ft.border.only(bottom=ft.border.BorderSide(1, ft.Colors.GREY_800))
+
 class ExerciseCard(ft.Container):
     def __init__(self, exercise_id, name, db, onDelete, show_snackbar_fn):
         super().__init__()
@@ -72,52 +262,58 @@ class ExerciseCard(ft.Container):
         self.padding = 15
         self.border_radius = 15
         self.bgcolor = ft.Colors.SURFACE_CONTAINER_HIGHEST
-        self.animate = ft.Animation(300, ft.AnimationCurve.EASE_OUT)
+        self.animate = CARD_ANIMATION
+
+        # History state; the controls below the header are only built on
+        # first expansion (see build_details) since most cards stay collapsed
+        self.history_rows = []
+        self.history_cursor = None
+        # Set until history_list holds the stored history; save_set adds its
+        # own rows directly, so logging a set doesn't make it stale
+        self.history_dirty = True
+        self.details_container = None
+
+        self.txt_last_set = ft.Text(size=12, color=ft.Colors.GREY_400)
+
+        # Set content of the Container
+        self.content = ft.Column([
+            ft.Row([
+                ft.Icon(ft.Icons.FITNESS_CENTER, color=ft.Colors.PRIMARY),
+                ft.Column([
+                    ft.Text(self.exercise_name, size=16, weight="bold"),
+                    self.txt_last_set
+                ], spacing=0, expand=True),
+                ft.IconButton(
+                    icon=ft.Icons.DELETE_OUTLINE, 
+                    icon_color=ft.Colors.ERROR, 
+                    tooltip="Remove",
+                    on_click=self.delete_exercise
+                ),
+                ft.IconButton(
+                    icon=ft.Icons.EXPAND_MORE, 
+                    on_click=self.toggle_details,
+                    tooltip="Details"
+                )
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+        ])
 
+    def build_details(self):
         # Styled Input fields
-        self.txt_weight = ft.TextField(
-            label="Weight", 
-            width=100, 
-            keyboard_type=ft.KeyboardType.NUMBER,
-            border_radius=10,
-            text_size=14,
-            dense=True,
-            content_padding=10
-        )
-        self.txt_reps = ft.TextField(
-            label="Reps", 
-            width=70, 
-            keyboard_type=ft.KeyboardType.NUMBER,
-            border_radius=10,
-            text_size=14,
-            dense=True,
-             content_padding=10
-        )
-        self.txt_sets = ft.TextField(
-            label="Sets",
-            width=70,
-            value="1",
-            keyboard_type=ft.KeyboardType.NUMBER,
-            border_radius=10,
-            text_size=14,
-            dense=True,
-             content_padding=10
-        )
+        self.txt_weight = ft.TextField(label="Weight", width=100, **NUMBER_FIELD_KWARGS)
+        self.txt_reps = ft.TextField(label="Reps", width=70, **NUMBER_FIELD_KWARGS)
+        self.txt_sets = ft.TextField(label="Sets", width=70, value="1", **NUMBER_FIELD_KWARGS)
         
         self.btn_save = ft.ElevatedButton(
             "Log", 
             icon=ft.Icons.SAVE, 
             on_click=self.save_set,
-            style=ft.ButtonStyle(
-                color=ft.Colors.WHITE,
-                bgcolor=ft.Colors.BLUE_600,
-                shape=ft.RoundedRectangleBorder(radius=10),
-                padding=10
-            )
+            style=SAVE_BUTTON_STYLE
         )
 
         # History View
         self.history_list = ft.Column(spacing=5) 
+        self.no_history = ft.Text("No logs yet.", color=ft.Colors.GREY_500, size=12)
+        self.btn_more = ft.TextButton("Load more", on_click=self.load_more_history, visible=False)
 
         self.details_container = ft.Container(
             content=ft.Column(
@@ -127,81 +323,103 @@ class ExerciseCard(ft.Container):
                     ft.Row([self.txt_weight, self.txt_reps, self.txt_sets, self.btn_save], wrap=True, alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                     ft.Divider(),
                     ft.Text("History", size=14, weight="bold", color=ft.Colors.GREY_400),
-                    self.history_list
+                    self.history_list,
+                    self.btn_more
                 ],
                 spacing=10
             ),
             visible=False,
             padding=ft.Padding(0, 10, 0, 0)
         )
+        self.content.controls.append(self.details_container)
 
-        # Set content of the Container
-        self.content = ft.Column([
-            ft.Row([
-                ft.Icon(ft.Icons.FITNESS_CENTER, color=ft.Colors.PRIMARY),
-                ft.Text(self.exercise_name, size=16, weight="bold", expand=True),
-                ft.IconButton(
-                    icon=ft.Icons.DELETE_OUTLINE, 
-                    icon_color=ft.Colors.ERROR, 
-                    tooltip="Remove",
-                    on_click=self.delete_exercise
-                ),
-                ft.IconButton(
-                    icon=ft.Icons.EXPAND_MORE, 
-                    on_click=self.toggle_details,
-                    tooltip="Details"
-                )
-            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-            self.details_container
-        ])
+    def set_last_set(self, weight, reps, sets):
+        if weight is None:
+            self.txt_last_set.value = "No sets yet"
+        else:
+            self.txt_last_set.value = f"Last: {weight}lbs x {reps} ({sets} sets)"
 
-    def toggle_details(self, e):
+    async def toggle_details(self, e):
         print(f"Toggle details clicked for {self.exercise_name}")
         try:
+            if self.details_container is None:
+                self.build_details()
             self.details_container.visible = not self.details_container.visible
             e.control.icon = ft.Icons.EXPAND_LESS if self.details_container.visible else ft.Icons.EXPAND_MORE
-            e.control.update() # Update the button icon properly
             
             if self.details_container.visible:
-                self.load_history()
+                await self.load_history()
             
-            self.update() # Update the card container to show/hide details
-            if self.page:
-                self.page.update() # Force page layout update
+            # One update covers the icon, the details and the history rows
+            self.update()
         except Exception as ex:
              print(f"Error toggling details: {ex}")
 
-    def load_history(self):
+    def build_history_row(self):
+        return ft.Container(
+            content=ft.Row([
+                ft.Text(size=12, color=ft.Colors.GREY_400, width=60),
+                ft.Text(size=13, weight="bold"),
+                ft.Text(size=13),
+                ft.Text(size=12, color=ft.Colors.GREY_400)
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            padding=5,
+            border=HISTORY_ROW_BORDER
+        )
+
+    def fill_history_row(self, row, weight, reps, sets, timestamp):
+        txt_date, txt_weight, txt_reps, txt_sets = row.content.controls
+        txt_date.value = datetime.fromtimestamp(timestamp).strftime(HISTORY_DATE_FMT) if timestamp is not None else ""
+        txt_weight.value = f"{weight}lbs"
+        txt_reps.value = f"x {reps}"
+        txt_sets.value = f"({sets} sets)"
+
+    async def load_history(self, more=False):
+        # Only fills history_list; callers batch it into their own update()
+        if not more and not self.history_dirty and self.history_list.controls:
+            return # nothing logged since the last render, keep it as is
         try:
-            history = self.db.get_history(self.exercise_id)
-            self.history_list.controls.clear()
-            if not history:
-                 self.history_list.controls.append(ft.Text("No logs yet.", color=ft.Colors.GREY_500, size=12))
+            if more and self.history_cursor:
+                # Snapshot the page position before awaiting: a second tap can
+                # run while this fetch is in flight
+                cursor = self.history_cursor
+                history = await asyncio.to_thread(self.db.get_history, self.exercise_id, *cursor)
+                if self.history_cursor != cursor:
+                    return # another load already moved the list on; drop this page
+                start = len(self.history_rows)
             else:
-                for w, r, s, t in history:
-                    try:
-                        dt = datetime.strptime(t, '%Y-%m-%d %H:%M:%S')
-                        date_str = dt.strftime('%b %d')
-                    except:
-                        date_str = t 
-                    
-                    self.history_list.controls.append(
-                        ft.Container(
-                            content=ft.Row([
-                                ft.Text(f"{date_str}", size=12, color=ft.Colors.GREY_400, width=60),
-                                ft.Text(f"{w}lbs", size=13, weight="bold"),
-                                ft.Text(f"x {r}", size=13),
-                                ft.Text(f"({s} sets)", size=12, color=ft.Colors.GREY_400)
-                            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                            padding=5,
-                            border=ft.border.only(bottom=ft.border.BorderSide(1, ft.Colors.GREY_800))
-                        )
-                    )
+                history = await asyncio.to_thread(self.db.get_history, self.exercise_id)
+                start = 0
+
+            # Reuse the row controls from the previous render and only
+            # rewrite their text; grow or trim the pool to the new count.
+            rows = self.history_rows
+            count = start + len(history)
+            while len(rows) < count:
+                rows.append(self.build_history_row())
+            del rows[count:]
+
+            for row, log in zip(rows[start:], history):
+                self.fill_history_row(row, log["weight"], log["reps"], log["sets"], log["timestamp"])
+
+            if history:
+                self.history_cursor = (history[-1]["timestamp"], history[-1]["id"])
+            elif not more:
+                self.history_cursor = None
+            # A short page means there is nothing older to fetch
+            self.btn_more.visible = len(history) == HISTORY_PAGE_SIZE
+
+            self.history_list.controls = list(rows) if rows else [self.no_history]
+            if not more:
+                self.history_dirty = False
         except Exception as ex:
              print(f"Error loading history: {ex}")
+
+    async def load_more_history(self, e):
+        await self.load_history(more=True)
         self.update()
 
-    def save_set(self, e):
+    async def save_set(self, e):
         if not self.txt_weight.value or not self.txt_reps.value:
             return
             
@@ -209,13 +427,32 @@ class ExerciseCard(ft.Container):
             w = float(self.txt_weight.value)
             r = int(self.txt_reps.value)
             s = int(self.txt_sets.value) if self.txt_sets.value else 1
-            
-            self.db.log_set(self.exercise_id, w, r, s)
-            
-            self.load_history()
-            self.show_snackbar(f"Logged: {w}lbs x {r}")
         except ValueError:
             self.show_snackbar("Invalid numbers", is_error=True)
+            return
+
+        # Waits for the batched write, but doesn't read the set back: taps
+        # landing within LOG_FLUSH_DELAY share one commit
+        saved = asyncio.wrap_future(await asyncio.to_thread(self.db.log_set, self.exercise_id, w, r, s))
+        try:
+            try:
+                logged_at = await asyncio.wait_for(asyncio.shield(saved), LOG_RETRY_DELAY)
+            except asyncio.TimeoutError:
+                # A failed write is retried; the set shows up once it commits
+                self.show_snackbar("Still saving set, will keep retrying")
+                logged_at = await saved
+        except sqlite3.IntegrityError as ex:
+            self.show_snackbar(f"Set not saved: {ex}", is_error=True)
+            return
+
+        self.set_last_set(w, r, s)
+        if not self.history_dirty:
+            row = self.build_history_row()
+            self.fill_history_row(row, w, r, s, logged_at)
+            self.history_rows.insert(0, row)
+            self.history_list.controls = list(self.history_rows)
+        self.update()
+        self.show_snackbar(f"Logged: {w}lbs x {r}")
 
     def delete_exercise(self, e):
         print(f"Delete clicked for ID: {self.exercise_id}") # Console log
@@ -223,10 +460,7 @@ class ExerciseCard(ft.Container):
             self.onDelete(self.exercise_id)
         except Exception as ex:
             print(f"Error in delete_exercise: {ex}")
-            try:
-                self.show_snackbar(f"Error: {ex}", is_error=True)
-            except:
-                pass
+            self.show_snackbar(f"Error: {ex}", is_error=True) # never raises
 
 
 # --- Main Application ---
@@ -261,12 +495,23 @@ def main(page: ft.Page):
         overlay = None # forward declaration
 
         def close(e=None):
+            if overlay not in page.overlay:
+                return # already dismissed while on_confirm was running
             page.overlay.remove(overlay)
             page.update()
         
-        def on_ok(e):
-            on_confirm(e)
-            close()
+        async def on_ok(e):
+            # on_confirm awaits the database; ignore repeat taps meanwhile
+            if btn_ok.disabled:
+                return
+            btn_ok.disabled = True
+            btn_ok.update()
+            try:
+                await on_confirm(e)
+            finally:
+                close()
+
+        btn_ok = ft.ElevatedButton(confirm_text, on_click=on_ok)
 
         card = ft.Container(
             content=ft.Column([
@@ -276,7 +521,7 @@ def main(page: ft.Page):
                 ft.Container(height=20),
                 ft.Row([
                     ft.TextButton("Cancel", on_click=close),
-                    ft.ElevatedButton(confirm_text, on_click=on_ok)
+                    btn_ok
                 ], alignment=ft.MainAxisAlignment.END)
             ], tight=True, width=300),
             padding=20,
@@ -302,12 +547,21 @@ def main(page: ft.Page):
     routines = ["Push", "Pull", "Legs"]
     routine_colors = [ft.Colors.BLUE_400, ft.Colors.RED_400, ft.Colors.GREEN_400]
 
-    def refresh_exercises(routine):
-        content_area.controls.clear()
-        exercises = db.get_exercises(routine)
-        
+    # Cards are kept per routine so switching tabs reuses them instead of
+    # rebuilding every card from scratch.
+    cards = {routine: {} for routine in routines}
+
+    async def refresh_exercises(routine):
+        exercises = await asyncio.to_thread(db.get_exercises, routine)
+        if routine != routines[page.navigation_bar.selected_index]:
+            return # user switched tabs while the query was running
+        cached = cards[routine]
+
+        for eid in cached.keys() - {row["id"] for row in exercises}:
+            del cached[eid]
+
         if not exercises:
-             content_area.controls.append(
+             content_area.controls = [
                  ft.Container(
                      content=ft.Column([
                          ft.Icon(ft.Icons.FITNESS_CENTER_OUTLINED, size=50, color=ft.Colors.GREY_700),
@@ -317,20 +571,22 @@ def main(page: ft.Page):
                      padding=40,
                      expand=True
                  )
-             )
+             ]
         else:
-            for eid, name, _ in exercises:
-                content_area.controls.append(
-                    ExerciseCard(eid, name, db, lambda eid: confirm_delete_handler(eid), show_snackbar)
-                )
-        content_area.update()
+            for row in exercises:
+                eid = row["id"]
+                if eid not in cached:
+                    cached[eid] = ExerciseCard(eid, row["name"], db, confirm_delete_handler, show_snackbar)
+                cached[eid].set_last_set(row["weight"], row["reps"], row["sets"])
+            content_area.controls = [cached[row["id"]] for row in exercises]
+        # No update() here: callers redraw once after their own changes
 
     def confirm_delete_handler(eid):
         print(f"DEBUG: confirm_delete_handler called for {eid}")
-        def do_delete(e):
+        async def do_delete(e):
             print(f"DEBUG: do_delete execution for {eid}")
-            db.remove_exercise(eid)
-            refresh_exercises(routines[page.navigation_bar.selected_index])
+            await asyncio.to_thread(db.remove_exercise, eid)
+            await refresh_exercises(routines[page.navigation_bar.selected_index])
             print("DEBUG: Exercise removed and view refreshed")
             
         show_custom_dialog(
@@ -345,10 +601,10 @@ def main(page: ft.Page):
         routine = routines[page.navigation_bar.selected_index]
         txt_name = ft.TextField(label="Exercise Name") # No autofocus to be safe
         
-        def do_save(e):
+        async def do_save(e):
             if txt_name.value:
-                db.add_exercise(txt_name.value, routine)
-                refresh_exercises(routine)
+                await asyncio.to_thread(db.add_exercise, txt_name.value, routine)
+                await refresh_exercises(routine)
             else:
                 show_snackbar("Name required", True)
 
@@ -367,11 +623,11 @@ def main(page: ft.Page):
         on_click=add_exercise_dialog
     )
 
-    def on_nav_change(e):
+    async def on_nav_change(e):
         idx = e.control.selected_index
         routine = routines[idx]
         fab.bgcolor = routine_colors[idx]
-        refresh_exercises(routine)
+        await refresh_exercises(routine)
         page.update()
 
     page.navigation_bar = ft.NavigationBar(
@@ -386,6 +642,19 @@ def main(page: ft.Page):
 
     page.floating_action_button = fab
 
+    def persist(e=None):
+        # Write out buffered sets before the OS can suspend or kill the app
+        db.flush_queued()
+        db.optimize()
+
+    def on_lifecycle_change(e):
+        # PAUSE precedes suspension on mobile, DETACH precedes teardown
+        if e.state in (ft.AppLifecycleState.PAUSE, ft.AppLifecycleState.DETACH):
+            persist()
+
+    page.on_app_lifecycle_state_change = on_lifecycle_change
+    page.on_close = persist
+
     page.add(
         ft.Container(
             content=content_area, 
@@ -394,6 +663,10 @@ def main(page: ft.Page):
         )
     )
 
-    refresh_exercises("Push")
+    async def load_first_routine():
+        await refresh_exercises(routines[0])
+        content_area.update()
+
+    page.run_task(load_first_routine)
 
 ft.app(target=main)